@@ -5,6 +5,13 @@ import streamlit as st
 import mysql.connector
 import pandas as pd
 import plotly.express as px 
+import threading
+from datetime import timedelta
+from expiry_scheduler import ExpiryScheduler, PanelSink, WebhookSink, log_sink
+from search_index import build_index
+from sketches import ApproxClaimStats
+from data_cleaning import clean_providers, clean_receivers, flagged_rows, quality_report
+from receiver_analytics import receiver_features, most_cancelled, most_active, status_by_type, favorite_food_by_type
 # -------------------------
 # Page config
 # -------------------------
@@ -33,6 +40,224 @@ def get_count(table_name):
     conn.close()
     return count
 
+# -------------------------
+# Expiry sweep (background)
+# -------------------------
+EXPIRY_WARN_HOURS = 24
+REFRESH_SECONDS = 60          # how often cached structures poll for new rows
+RECONCILE_SECONDS = 3600      # how often the expiry heap is checked for deleted or re-dated listings
+
+def refresh_cached(obj, poll):
+    # Runs poll(obj) at most every REFRESH_SECONDS; other sessions skip while one is polling
+    if not obj.refresh_lock.acquire(blocking=False):
+        return obj
+    try:
+        now = pd.Timestamp.now()
+        if (now - obj.last_refresh).total_seconds() >= REFRESH_SECONDS:
+            poll(obj)
+            obj.last_refresh = now
+    finally:
+        obj.refresh_lock.release()
+    return obj
+
+def refresh_expiry_listings(scheduler):
+    # New listings are polled by Food_ID. Deleted listings and edited
+    # Expiry_Dates are found by re-reading the three columns far less often,
+    # so query 5 can lag an edited expiry by up to RECONCILE_SECONDS.
+    conn = create_connection()
+    last_id = int(scheduler.max_food_id) if scheduler.max_food_id is not None else 0
+    scheduler.load(pd.read_sql("SELECT Food_ID, Provider_ID, Expiry_Date FROM food_listings WHERE Food_ID > %s",
+                               conn, params=(last_id,)))
+    now = pd.Timestamp.now()
+    if (now - scheduler.last_reconcile).total_seconds() >= RECONCILE_SECONDS:
+        scheduler.sync(pd.read_sql("SELECT Food_ID, Provider_ID, Expiry_Date FROM food_listings", conn))
+        scheduler.last_reconcile = now
+    conn.close()
+
+@st.cache_resource
+def get_expiry_scheduler():
+    panel = PanelSink()
+    scheduler = ExpiryScheduler(warn_hours=EXPIRY_WARN_HOURS,
+                                sinks=[log_sink, WebhookSink("http://localhost/expiry-webhook"), panel],
+                                refresh=refresh_expiry_listings, refresh_seconds=REFRESH_SECONDS)
+    scheduler.panel = panel
+    scheduler.last_reconcile = pd.Timestamp.now()
+    conn = create_connection()
+    # Listings that expired before startup are counted without sending events
+    scheduler.load(pd.read_sql("SELECT Food_ID, Provider_ID, Expiry_Date FROM food_listings", conn), notify=False)
+    conn.close()
+    scheduler.tick()
+    return scheduler.start()
+
+def expired_listings_by_provider():
+    # Query 5 from the live expired-set instead of scanning food_listings
+    counts = get_expiry_scheduler().expired_by_provider()
+    df = pd.DataFrame(list(counts.items()), columns=["Provider_ID", "Expired_Listings"])
+    if df.empty:
+        return pd.DataFrame(columns=["Name", "Expired_Listings"])
+    df = df.merge(provider_names(df["Provider_ID"]), on="Provider_ID").groupby("Name", as_index=False)["Expired_Listings"].sum()
+    return df.sort_values("Expired_Listings", ascending=False)
+
+def provider_names(provider_ids):
+    ids = ", ".join(str(int(i)) for i in provider_ids) or "NULL"
+    conn = create_connection()
+    names = pd.read_sql(f"SELECT Provider_ID, Name FROM providers WHERE Provider_ID IN ({ids})", conn)
+    conn.close()
+    return names
+
+# -------------------------
+# Search index
+# -------------------------
+@st.cache_resource
+def get_search_index():
+    conn = create_connection()
+    providers = pd.read_sql("SELECT Provider_ID, Name, Address, City FROM providers", conn)
+    receivers = pd.read_sql("SELECT Receiver_ID, Name, City FROM receivers", conn)
+    food_listings = pd.read_sql("SELECT Food_ID, Food_Name, Expiry_Date, Provider_ID, Location, Food_Type, Meal_Type FROM food_listings", conn)
+    conn.close()
+    index = build_index(providers, receivers, food_listings)
+    index.refresh_lock = threading.Lock()
+    index.last_refresh = pd.Timestamp.now()
+    return index
+
+def poll_search_index(index):
+    # Adds rows inserted since the last poll; edits and deletions are not reflected
+    conn = create_connection()
+    last = {kind: int(last_id) for kind, last_id in index.last_ids.items()}
+    providers = pd.read_sql("SELECT Provider_ID, Name, Address, City FROM providers WHERE Provider_ID > %s",
+                            conn, params=(last.get("Provider", 0),))
+    receivers = pd.read_sql("SELECT Receiver_ID, Name, City FROM receivers WHERE Receiver_ID > %s",
+                            conn, params=(last.get("Receiver", 0),))
+    food_listings = pd.read_sql("SELECT Food_ID, Food_Name, Expiry_Date, Provider_ID, Location, Food_Type, Meal_Type "
+                                "FROM food_listings WHERE Food_ID > %s", conn, params=(last.get("Listing", 0),))
+    conn.close()
+    index.add_providers(providers)
+    index.add_receivers(receivers)
+    if not food_listings.empty:
+        index.add_listings(food_listings, provider_names(food_listings["Provider_ID"]))
+
+# -------------------------
+# Approximate analytics (sketches)
+# -------------------------
+@st.cache_resource
+def get_approx_stats():
+    conn = create_connection()
+    food_listings = pd.read_sql("SELECT Food_ID, Provider_ID FROM food_listings", conn)
+    claims = pd.read_sql("SELECT Claim_ID, Food_ID, Receiver_ID, Status FROM claims", conn)
+    conn.close()
+    stats = ApproxClaimStats(capacity=ApproxClaimStats.capacity_for(food_listings["Provider_ID"]))
+    stats.load(food_listings, claims)
+    stats.refresh_lock = threading.Lock()
+    stats.last_refresh = pd.Timestamp.now()
+    return stats
+
+def poll_approx_stats(stats):
+    # Feeds listings and claims inserted since the last poll into the sketches,
+    # and counts earlier Pending claims that have been resolved since
+    conn = create_connection()
+    food_listings = pd.read_sql("SELECT Food_ID, Provider_ID FROM food_listings WHERE Food_ID > %s",
+                                conn, params=(stats.last_food_id,))
+    claims = pd.read_sql("""
+        SELECT c.Claim_ID, f.Provider_ID, c.Receiver_ID, c.Status
+        FROM claims c
+        JOIN food_listings f ON c.Food_ID = f.Food_ID
+        WHERE c.Claim_ID > %s
+    """, conn, params=(stats.last_claim_id,))
+    oldest_pending = stats.oldest_pending()
+    resolved = None
+    if oldest_pending is not None:
+        resolved = pd.read_sql("SELECT Claim_ID, Status FROM claims WHERE Claim_ID BETWEEN %s AND %s AND Status <> 'Pending'",
+                               conn, params=(int(oldest_pending), stats.last_claim_id))
+    conn.close()
+    if resolved is not None:
+        stats.update_statuses(resolved)
+    stats.add_listings(food_listings)
+    stats.add_claims(claims)
+
+def approx_answer(sketch_name, k, value_name):
+    stats = refresh_cached(get_approx_stats(), poll_approx_stats)
+    if sketch_name == "receivers":
+        df = stats.unique_receivers(k)
+    else:
+        df = stats.top_k(sketch_name, k, value_name)
+    return df.merge(provider_names(df["Provider_ID"]), on="Provider_ID")
+
+approx_provider_queries = {
+    "3. Providers with most listings": (("listings", 10, "Total_Listings"), "Listings top-k (Space-Saving)"),
+    "4. Top 5 providers with maximum claims": (("claims", 5, "Total_Claims"), "Claims top-k (Space-Saving)"),
+    "7. Provider with maximum unique receivers": (("receivers", 1, "Unique_Receivers"), "Unique receivers (HyperLogLog)"),
+    "11. Top providers by completed claims": (("completed", 5, "Completed_Claims"), "Completed top-k (Space-Saving)")
+}
+
+# -------------------------
+# Data quality
+# -------------------------
+@st.cache_data
+def get_cleaned_entities():
+    conn = create_connection()
+    providers = pd.read_sql("SELECT * FROM providers", conn)
+    receivers = pd.read_sql("SELECT * FROM receivers", conn)
+    conn.close()
+    return clean_providers(providers), clean_receivers(receivers)
+
+# -------------------------
+# Receiver features (precomputed)
+# -------------------------
+@st.cache_data
+def get_receiver_features():
+    conn = create_connection()
+    receivers = pd.read_sql("SELECT Receiver_ID, Name, Type, City FROM receivers", conn)
+    claims = pd.read_sql("SELECT Claim_ID, Food_ID, Receiver_ID, Status, Timestamp FROM claims", conn)
+    food_listings = pd.read_sql("SELECT Food_ID, Food_Type FROM food_listings", conn)
+    conn.close()
+    return receiver_features(receivers, claims, food_listings)
+
+# -------------------------
+# Partitioned claims (hot/cold)
+# -------------------------
+# See `python claims_partitions.py mysql-ddl` / `mysql-compact` for the partition setup
+# Compaction keeps the raw partitions, so every other claims query stays exact;
+# only the range charts read claims_monthly_summary for compacted months.
+@st.cache_data(ttl=3600)
+def get_summary_cutoff():
+    # First day after the newest compacted month, or None without a summary.
+    # Months are compacted oldest first, so everything before it is summarised.
+    conn = create_connection()
+    cursor = conn.cursor()
+    cursor.execute("SHOW TABLES LIKE 'claims_monthly_summary'")
+    cutoff = None
+    if cursor.fetchone() is not None:
+        cursor.execute("SELECT MAX(Month) FROM claims_monthly_summary")
+        month = cursor.fetchone()[0]
+        if month:
+            cutoff = (pd.Period(month, freq="M") + 1).start_time.date()
+    conn.close()
+    return cutoff
+
+# Short cache so today's claims reach the date picker; with KEY (Timestamp)
+# the MIN/MAX is an index lookup per partition
+@st.cache_data(ttl=REFRESH_SECONDS)
+def get_claim_bounds():
+    conn = create_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT MIN(Timestamp), MAX(Timestamp) FROM claims")
+    first_claim, last_claim = cursor.fetchone()
+    conn.close()
+    return pd.Timestamp(first_claim).date(), pd.Timestamp(last_claim).date()
+
+def read_claims_in_range(raw_query, summary_query, start, end, conn):
+    # Days before the cutoff come from the summary and the rest from raw claims,
+    # so no day is counted twice; the Timestamp range lets MySQL prune partitions
+    end = end + timedelta(days=1)
+    cutoff = get_summary_cutoff()
+    frames = []
+    if cutoff and start < cutoff:
+        frames.append(pd.read_sql(summary_query, conn, params=(start, min(end, cutoff))))
+    raw_start = max(start, cutoff) if cutoff else start
+    if raw_start < end:
+        frames.append(pd.read_sql(raw_query, conn, params=(raw_start, end)))
+    return pd.concat(frames, ignore_index=True)
+
 # -------------------------
 # Define Queries (Global)
 # -------------------------
@@ -133,6 +358,13 @@ provider_queries = {
     """
 }
 
+receiver_queries = {
+    "13. Receivers with the highest share of cancelled claims": most_cancelled,
+    "14. Most active receivers": most_active,
+    "15. Claim status breakdown per receiver type": status_by_type,
+    "16. Favorite food type by receiver type": favorite_food_by_type
+}
+
 descriptions = {
     "1. List all providers": "Shows a preview of provider data (first 20 rows).",
     "2. Count of providers by city": "Number of providers in each city.",
@@ -145,7 +377,11 @@ descriptions = {
     "9. Providers with zero claims": "Providers whose listings were never claimed.",
     "10. City-wise claim distribution for providers": "How claims are distributed across cities.",
     "11. Top providers by completed claims": "Top providers ranked by completed claims.",
-    "12. Claim status breakdown per provider": "Shows claim status (Completed/Pending) by provider."
+    "12. Claim status breakdown per provider": "Shows claim status (Completed/Pending) by provider.",
+    "13. Receivers with the highest share of cancelled claims": "Receivers (2+ claims) ranked by share of cancelled claims.",
+    "14. Most active receivers": "Receivers with the most claims, their completion rate and average days between claims.",
+    "15. Claim status breakdown per receiver type": "Completed/Pending/Cancelled claims and cancelled share per receiver type.",
+    "16. Favorite food type by receiver type": "How many receivers of each type most often claim each food type."
 }
 
 # -------------------------
@@ -223,6 +459,40 @@ elif menu == "Dashboard":
             conn.close()
             st.dataframe(df, use_container_width=True)
 
+        st.markdown("### 🔍 Search")
+        search_col, type_col, meal_col, fresh_col = st.columns([4,2,2,2])
+        with search_col: search_text = st.text_input("Search food, providers, receivers or locations:")
+        with type_col: search_food_type = st.selectbox("Food Type:", ["All", "Vegetarian", "Non-Vegetarian", "Vegan"])
+        with meal_col: search_meal_type = st.selectbox("Meal Type:", ["All", "Breakfast", "Lunch", "Dinner", "Snacks"])
+        with fresh_col: search_unexpired = st.checkbox("Only unexpired listings")
+        if search_text:
+            results = refresh_cached(get_search_index(), poll_search_index).search_df(
+                search_text,
+                food_type=None if search_food_type == "All" else search_food_type,
+                meal_type=None if search_meal_type == "All" else search_meal_type,
+                expires_after=pd.Timestamp.today().normalize() if search_unexpired else None
+            )
+            if results.empty:
+                st.info("No matches found.")
+            else:
+                st.dataframe(results, use_container_width=True)
+
+        cleaned_providers, cleaned_receivers = get_cleaned_entities()
+        st.markdown("### 🧹 Data Quality")
+        for label, cleaned in (("Providers", cleaned_providers), ("Receivers", cleaned_receivers)):
+            report = quality_report(cleaned)
+            st.write(f"**{label}:** " + ", ".join(f"{k}: {v}" for k, v in report.items()))
+            flagged = flagged_rows(cleaned)
+            if not flagged.empty:
+                st.dataframe(flagged, use_container_width=True)
+
+        st.markdown("### ⏰ Expiry Alerts")
+        alerts = pd.DataFrame(get_expiry_scheduler().panel.events())
+        if alerts.empty:
+            st.info(f"No listings expiring within {EXPIRY_WARN_HOURS} hours.")
+        else:
+            st.dataframe(alerts, use_container_width=True)
+
     except Exception as e:
         st.error(f"❌ Error fetching KPI data: {e}")
 
@@ -243,13 +513,23 @@ elif menu == "Queries":
         with col4: st.markdown(kpi_box("Claims", total_claims), unsafe_allow_html=True)
 
         st.markdown("### 🔎 SQL Queries")
-        selected_query = st.selectbox("Choose a question:", list(provider_queries.keys()))
+        selected_query = st.selectbox("Choose a question:", list(provider_queries.keys()) + list(receiver_queries.keys()))
+        approx_mode = st.checkbox("⚡ Approximate mode (queries 3, 4, 7 and 11)")
 
         if st.button("Generate Answer"):
             try:
-                conn = create_connection()
-                df = pd.read_sql(provider_queries[selected_query], conn)
-                conn.close()
+                if approx_mode and selected_query in approx_provider_queries:
+                    approx_args, bound_name = approx_provider_queries[selected_query]
+                    df = approx_answer(*approx_args)
+                    st.caption(f"Approximate answer — {bound_name}: {get_approx_stats().error_bounds()[bound_name]}")
+                elif selected_query in receiver_queries:
+                    df = receiver_queries[selected_query](get_receiver_features())
+                elif selected_query == "5. Providers with expired food listings":
+                    df = expired_listings_by_provider()
+                else:
+                    conn = create_connection()
+                    df = pd.read_sql(provider_queries[selected_query], conn)
+                    conn.close()
                 st.dataframe(df, use_container_width=True)
                 st.info(descriptions[selected_query])
             except Exception as e:
@@ -297,7 +577,9 @@ elif menu == "Data Visualization":
             "Listings by Food Type",
             "Quantity vs Expiry Date",
             "Providers Contribution to Listings",
-            "Claims Trend Over Time"
+            "Claims Trend Over Time",
+            "Receiver Cancellation Share by Type",
+            "Top Receivers by Cancelled Claims"
         ]
         selected_viz = st.selectbox("Select Visualization:", viz_options)
 
@@ -309,6 +591,13 @@ elif menu == "Data Visualization":
             filter_option = st.selectbox("Filter Cities:", ["All", "Top 5", "Top 10"])
         elif selected_viz == "Listings by Food Type":
             filter_option = st.selectbox("Filter by Food Type:", ["All", "Vegetarian", "Non-Vegetarian", "Vegan"])
+        elif selected_viz in ("Claim Status Distribution", "Claims Trend Over Time"):
+            # Claim charts only scan the partitions inside the selected range
+            first_claim, last_claim = get_claim_bounds()
+            claim_range = st.date_input("Claim date range:", (max(first_claim, last_claim - timedelta(days=30)), last_claim),
+                                        min_value=first_claim, max_value=last_claim)
+            if len(claim_range) != 2:
+                st.stop()
 
         # Fetch Data + Visualization
         conn = create_connection()
@@ -327,8 +616,10 @@ elif menu == "Data Visualization":
             st.plotly_chart(fig)
 
         elif selected_viz == "Claim Status Distribution":
-            query = "SELECT Status, COUNT(*) AS Count FROM claims GROUP BY Status"
-            df = pd.read_sql(query, conn)
+            query = "SELECT Status, COUNT(*) AS Count FROM claims WHERE Timestamp >= %s AND Timestamp < %s GROUP BY Status"
+            summary_query = "SELECT Status, SUM(Claims) AS Count FROM claims_monthly_summary WHERE Date >= %s AND Date < %s GROUP BY Status"
+            df = read_claims_in_range(query, summary_query, *claim_range, conn)
+            df = df.groupby("Status", as_index=False)["Count"].sum()
             fig = px.pie(df, names="Status", values="Count", title="Claim Status Distribution",
                          color_discrete_sequence=px.colors.qualitative.Set2)
             st.plotly_chart(fig)
@@ -403,15 +694,35 @@ elif menu == "Data Visualization":
             query = """
                 SELECT DATE(Timestamp) AS Date, COUNT(*) AS Total_Claims
                 FROM claims
-                WHERE Timestamp IS NOT NULL
+                WHERE Timestamp >= %s AND Timestamp < %s
                 GROUP BY DATE(Timestamp)
-                ORDER BY Date
             """
-            df = pd.read_sql(query, conn)
+            summary_query = """
+                SELECT Date, SUM(Claims) AS Total_Claims
+                FROM claims_monthly_summary
+                WHERE Date >= %s AND Date < %s
+                GROUP BY Date
+            """
+            df = read_claims_in_range(query, summary_query, *claim_range, conn)
+            df = df.groupby("Date", as_index=False)["Total_Claims"].sum().sort_values("Date")
             fig = px.area(df, x="Date", y="Total_Claims", title="Claims Trend Over Time",
                           color_discrete_sequence=["#FF69B4"])
             st.plotly_chart(fig)
 
+        elif selected_viz == "Receiver Cancellation Share by Type":
+            df = status_by_type(get_receiver_features())
+            fig = px.bar(df, x="Type", y="Cancelled_Share",
+                         title="Receiver Cancellation Share by Type",
+                         color_discrete_sequence=["#6A5ACD"])
+            st.plotly_chart(fig)
+
+        elif selected_viz == "Top Receivers by Cancelled Claims":
+            df = get_receiver_features().sort_values(["Cancelled", "Cancelled_Share"], ascending=False).head(10)
+            fig = px.bar(df, x="Cancelled", y="Name", orientation="h",
+                         title="Top Receivers by Cancelled Claims",
+                         color="Cancelled_Share", color_continuous_scale="Reds")
+            st.plotly_chart(fig)
+
         conn.close()
 
     except Exception as e:
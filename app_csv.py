@@ -4,7 +4,13 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from datetime import datetime
+from datetime import timedelta
+from expiry_scheduler import ExpiryScheduler, PanelSink, WebhookSink, log_sink
+from search_index import build_index
+from sketches import ApproxClaimStats
+from data_cleaning import clean_providers, clean_receivers, flagged_rows, quality_report
+from claims_partitions import ClaimsStore, claims_fingerprint
+from receiver_analytics import receiver_features, most_cancelled, most_active, status_by_type, favorite_food_by_type
 
 # -------------------------
 # Page config
@@ -29,6 +35,85 @@ def load_data():
 
 providers, receivers, food_listings, claims = load_data()
 
+# -------------------------
+# Expiry sweep (background)
+# -------------------------
+EXPIRY_WARN_HOURS = 24
+
+@st.cache_resource
+def get_expiry_scheduler():
+    panel = PanelSink()
+    scheduler = ExpiryScheduler(warn_hours=EXPIRY_WARN_HOURS,
+                                sinks=[log_sink, WebhookSink("http://localhost/expiry-webhook"), panel])
+    scheduler.panel = panel
+    # Listings that expired before startup are counted without sending events
+    scheduler.load(food_listings, notify=False)
+    scheduler.tick()
+    return scheduler.start()
+
+expiry_scheduler = get_expiry_scheduler()
+
+# -------------------------
+# Search index
+# -------------------------
+@st.cache_resource
+def get_search_index():
+    return build_index(providers, receivers, food_listings)
+
+search_index = get_search_index()
+
+# -------------------------
+# Approximate analytics (sketches)
+# -------------------------
+@st.cache_resource
+def get_approx_stats():
+    stats = ApproxClaimStats(capacity=ApproxClaimStats.capacity_for(food_listings["Provider_ID"]))
+    stats.load(food_listings, claims)
+    return stats
+
+approx_stats = get_approx_stats()
+
+# -------------------------
+# Data quality
+# -------------------------
+@st.cache_data
+def get_cleaned_entities():
+    # Normalized contacts/addresses and invalid/duplicate flags; only the
+    # Data Quality section reads these, every other view uses the raw tables
+    return clean_providers(providers), clean_receivers(receivers)
+
+# -------------------------
+# Receiver features (precomputed)
+# -------------------------
+@st.cache_data
+def get_receiver_features():
+    return receiver_features(receivers, claims, food_listings)
+
+receiver_feature_table = get_receiver_features()
+
+# -------------------------
+# Partitioned claims (hot/cold)
+# -------------------------
+@st.cache_resource
+def get_claims_store():
+    # Built with `python claims_partitions.py build`; falls back to claims.csv otherwise.
+    # The KPIs, queries, receiver features and sketches still need every claim in
+    # memory, so the store only serves the range charts, and only while it holds
+    # the same claims with the same statuses as claims.csv (a store built from an
+    # older export is ignored).
+    store = ClaimsStore()
+    stats = store.stats()
+    dated = claims.dropna(subset=['Timestamp']).drop_duplicates('Claim_ID', keep='last')
+    if stats is None or (stats["claims"], stats["fingerprint"]) != (len(dated), claims_fingerprint(dated)):
+        return None
+    return store
+
+claims_store = get_claims_store()
+
+def claims_in_range(start, end):
+    start, end = pd.Timestamp(start), pd.Timestamp(end) + pd.Timedelta(days=1)
+    return claims[(claims['Timestamp'] >= start) & (claims['Timestamp'] < end)]
+
 # -------------------------
 # Get counts
 # -------------------------
@@ -53,10 +138,9 @@ def query_4():  # Top 5 providers with maximum claims
     df = merged.groupby("Provider_ID")['Claim_ID'].count().reset_index(name="Total_Claims")
     return df.merge(providers[['Provider_ID','Name']], on="Provider_ID").sort_values("Total_Claims", ascending=False).head(5)
 
-def query_5():  # Providers with expired food listings
-    today = pd.Timestamp(datetime.today().date())
-    expired = food_listings[food_listings['Expiry_Date'] < today]
-    df = expired.groupby("Provider_ID").size().reset_index(name="Expired_Listings")
+def query_5():  # Providers with expired food listings (read from the live expired-set)
+    counts = expiry_scheduler.expired_by_provider()
+    df = pd.DataFrame(list(counts.items()), columns=["Provider_ID", "Expired_Listings"])
     return df.merge(providers[['Provider_ID','Name']], on="Provider_ID").sort_values("Expired_Listings", ascending=False)
 
 def query_6():  # Average food quantity provided per provider
@@ -109,6 +193,36 @@ provider_queries = {
     "12. Claim status breakdown per provider": query_12
 }
 
+receiver_queries = {
+    "13. Receivers with the highest share of cancelled claims": most_cancelled,
+    "14. Most active receivers": most_active,
+    "15. Claim status breakdown per receiver type": status_by_type,
+    "16. Favorite food type by receiver type": favorite_food_by_type
+}
+
+def approx_query_3():  # Providers with most listings (Space-Saving)
+    df = approx_stats.top_k("listings", 10, "Total_Listings")
+    return df.merge(providers[['Provider_ID','Name']], on="Provider_ID")
+
+def approx_query_4():  # Top 5 providers with maximum claims (Space-Saving)
+    df = approx_stats.top_k("claims", 5, "Total_Claims")
+    return df.merge(providers[['Provider_ID','Name']], on="Provider_ID")
+
+def approx_query_7():  # Provider with maximum unique receivers (HyperLogLog)
+    df = approx_stats.unique_receivers(1)
+    return df.merge(providers[['Provider_ID','Name']], on="Provider_ID")
+
+def approx_query_11():  # Top providers by completed claims (Space-Saving)
+    df = approx_stats.top_k("completed", 5, "Completed_Claims")
+    return df.merge(providers[['Provider_ID','Name']], on="Provider_ID")
+
+approx_provider_queries = {
+    "3. Providers with most listings": (approx_query_3, "Listings top-k (Space-Saving)"),
+    "4. Top 5 providers with maximum claims": (approx_query_4, "Claims top-k (Space-Saving)"),
+    "7. Provider with maximum unique receivers": (approx_query_7, "Unique receivers (HyperLogLog)"),
+    "11. Top providers by completed claims": (approx_query_11, "Completed top-k (Space-Saving)")
+}
+
 descriptions = {
     "1. List all providers": "Shows a preview of provider data (first 20 rows).",
     "2. Count of providers by city": "Number of providers in each city.",
@@ -121,7 +235,11 @@ descriptions = {
     "9. Providers with zero claims": "Providers whose listings were never claimed.",
     "10. City-wise claim distribution for providers": "How claims are distributed across cities.",
     "11. Top providers by completed claims": "Top providers ranked by completed claims.",
-    "12. Claim status breakdown per provider": "Shows claim status (Completed/Pending) by provider."
+    "12. Claim status breakdown per provider": "Shows claim status (Completed/Pending) by provider.",
+    "13. Receivers with the highest share of cancelled claims": "Receivers (2+ claims) ranked by share of cancelled claims.",
+    "14. Most active receivers": "Receivers with the most claims, their completion rate and average days between claims.",
+    "15. Claim status breakdown per receiver type": "Completed/Pending/Cancelled claims and cancelled share per receiver type.",
+    "16. Favorite food type by receiver type": "How many receivers of each type most often claim each food type."
 }
 
 # -------------------------
@@ -202,6 +320,40 @@ elif menu == "Dashboard":
     if st.button("Generate Table"):
         st.dataframe(selected_table.head(20), use_container_width=True)
 
+    st.markdown("### 🔍 Search")
+    search_col, type_col, meal_col, fresh_col = st.columns([4,2,2,2])
+    with search_col: search_text = st.text_input("Search food, providers, receivers or locations:")
+    with type_col: search_food_type = st.selectbox("Food Type:", ["All", "Vegetarian", "Non-Vegetarian", "Vegan"])
+    with meal_col: search_meal_type = st.selectbox("Meal Type:", ["All", "Breakfast", "Lunch", "Dinner", "Snacks"])
+    with fresh_col: search_unexpired = st.checkbox("Only unexpired listings")
+    if search_text:
+        results = search_index.search_df(
+            search_text,
+            food_type=None if search_food_type == "All" else search_food_type,
+            meal_type=None if search_meal_type == "All" else search_meal_type,
+            expires_after=pd.Timestamp.today().normalize() if search_unexpired else None
+        )
+        if results.empty:
+            st.info("No matches found.")
+        else:
+            st.dataframe(results, use_container_width=True)
+
+    cleaned_providers, cleaned_receivers = get_cleaned_entities()
+    st.markdown("### 🧹 Data Quality")
+    for label, cleaned in (("Providers", cleaned_providers), ("Receivers", cleaned_receivers)):
+        report = quality_report(cleaned)
+        st.write(f"**{label}:** " + ", ".join(f"{k}: {v}" for k, v in report.items()))
+        flagged = flagged_rows(cleaned)
+        if not flagged.empty:
+            st.dataframe(flagged, use_container_width=True)
+
+    st.markdown("### ⏰ Expiry Alerts")
+    alerts = pd.DataFrame(expiry_scheduler.panel.events())
+    if alerts.empty:
+        st.info(f"No listings expiring within {EXPIRY_WARN_HOURS} hours.")
+    else:
+        st.dataframe(alerts, use_container_width=True)
+
 # -------------------------
 # Queries Page
 # -------------------------
@@ -218,10 +370,20 @@ elif menu == "Queries":
     with col4: st.markdown(kpi_box("Claims", total_claims), unsafe_allow_html=True)
 
     st.markdown("### 🔎 CSV Queries")
-    selected_query = st.selectbox("Choose a question:", list(provider_queries.keys()))
+    selected_query = st.selectbox("Choose a question:", list(provider_queries.keys()) + list(receiver_queries.keys()))
+    approx_mode = st.checkbox("⚡ Approximate mode (queries 3, 4, 7 and 11)")
     if st.button("Generate Answer"):
-        df = provider_queries[selected_query]()
-        st.dataframe(df, use_container_width=True)
+        if approx_mode and selected_query in approx_provider_queries:
+            approx_fn, bound_name = approx_provider_queries[selected_query]
+            df = approx_fn()
+            st.dataframe(df, use_container_width=True)
+            st.caption(f"Approximate answer — {bound_name}: {approx_stats.error_bounds()[bound_name]}")
+        elif selected_query in receiver_queries:
+            df = receiver_queries[selected_query](receiver_feature_table)
+            st.dataframe(df, use_container_width=True)
+        else:
+            df = provider_queries[selected_query]()
+            st.dataframe(df, use_container_width=True)
         st.info(descriptions[selected_query])
 
     st.markdown("### 🛠️ Run a Custom Pandas Query")
@@ -258,7 +420,9 @@ elif menu == "Data Visualization":
         "Listings by Food Type",
         "Quantity vs Expiry Date",
         "Providers Contribution to Listings",
-        "Claims Trend Over Time"
+        "Claims Trend Over Time",
+        "Receiver Cancellation Share by Type",
+        "Top Receivers by Cancelled Claims"
     ]
     selected_viz = st.selectbox("Select Visualization:", viz_options)
 
@@ -273,6 +437,17 @@ elif menu == "Data Visualization":
     elif selected_viz == "Listings by Food Type":
         types = ["All"] + food_listings["Food_Type"].dropna().unique().tolist()
         filter_option = st.selectbox("Filter by Food Type:", types)
+    elif selected_viz in ("Claim Status Distribution", "Claims Trend Over Time"):
+        # Claim charts only read the partitions inside the selected range
+        if claims_store:
+            first_claim, last_claim = claims_store.date_range()
+        else:
+            first_claim, last_claim = claims['Timestamp'].min(), claims['Timestamp'].max()
+        first_claim, last_claim = first_claim.date(), last_claim.date()
+        claim_range = st.date_input("Claim date range:", (max(first_claim, last_claim - timedelta(days=30)), last_claim),
+                                    min_value=first_claim, max_value=last_claim)
+        if len(claim_range) != 2:
+            st.stop()
 
     # -------------------------
     # Visualizations
@@ -289,7 +464,10 @@ elif menu == "Data Visualization":
 
     # Claim Status Distribution
     elif selected_viz == "Claim Status Distribution":
-        df = claims.groupby("Status").size().reset_index(name="Count")
+        if claims_store:
+            df = claims_store.status_counts(*claim_range, food_listings)
+        else:
+            df = claims_in_range(*claim_range).groupby("Status").size().reset_index(name="Count")
         fig = px.pie(df, names="Status", values="Count", title="Claim Status Distribution", color_discrete_sequence=px.colors.qualitative.Set2)
         st.plotly_chart(fig)
 
@@ -332,10 +510,26 @@ elif menu == "Data Visualization":
 
     # Claims Trend Over Time
     elif selected_viz == "Claims Trend Over Time":
-        df = claims.dropna(subset=['Timestamp']).groupby(claims['Timestamp'].dt.date).size().reset_index(name="Total_Claims").sort_values("Timestamp")
+        if claims_store:
+            df = claims_store.daily_counts(*claim_range, food_listings).rename(columns={"Date": "Timestamp"})
+        else:
+            in_range = claims_in_range(*claim_range)
+            df = in_range.groupby(in_range['Timestamp'].dt.date).size().reset_index(name="Total_Claims").sort_values("Timestamp")
         fig = px.area(df, x="Timestamp", y="Total_Claims", title="Claims Trend Over Time", color_discrete_sequence=["#FF69B4"])
         st.plotly_chart(fig)
 
+    # Receiver Cancellation Share by Type
+    elif selected_viz == "Receiver Cancellation Share by Type":
+        df = status_by_type(receiver_feature_table)
+        fig = px.bar(df, x="Type", y="Cancelled_Share", title="Receiver Cancellation Share by Type", color_discrete_sequence=["#6A5ACD"])
+        st.plotly_chart(fig)
+
+    # Top Receivers by Cancelled Claims
+    elif selected_viz == "Top Receivers by Cancelled Claims":
+        df = receiver_feature_table.sort_values(["Cancelled", "Cancelled_Share"], ascending=False).head(10)
+        fig = px.bar(df, x="Cancelled", y="Name", orientation="h", title="Top Receivers by Cancelled Claims", color="Cancelled_Share", color_continuous_scale="Reds")
+        st.plotly_chart(fig)
+
 # -------------------------
 # Creator Info Page
 # -------------------------
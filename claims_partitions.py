@@ -0,0 +1,268 @@
+# -------------------------
+# Imports
+# -------------------------
+import argparse
+import json
+import os
+import shutil
+
+import pandas as pd
+
+CLAIMS_PARTITION_DIR = "claims_partitions"
+HOT_MONTHS = 3          # months kept as raw claims; older ones are compacted
+SUMMARY_COLUMNS = ["Date", "Provider_ID", "Status", "Claims"]
+_FINGERPRINT_MOD = 1 << 64
+
+def claim_hashes(claims):
+    # One hash per (Claim_ID, Status); their sum is an order-independent
+    # fingerprint that changes when any claim is added, removed or re-statused
+    keys = claims["Claim_ID"].astype("int64").astype(str) + ":" + claims["Status"].astype(str)
+    return pd.util.hash_pandas_object(keys, index=False)
+
+def claims_fingerprint(claims):
+    return int(claim_hashes(claims).sum()) % _FINGERPRINT_MOD
+
+# -------------------------
+# Month helpers
+# -------------------------
+def months_between(start, end):
+    # Month keys overlapping [start, end]; used to prune partitions
+    return [p.strftime("%Y-%m") for p in pd.period_range(pd.Timestamp(start), pd.Timestamp(end), freq="M")]
+
+# -------------------------
+# MySQL range partitions
+# -------------------------
+def mysql_partition_ddl(first_month, last_month):
+    # MySQL requires the partition column in every unique key, so the
+    # primary key becomes (Claim_ID, Timestamp).
+    parts = []
+    for period in pd.period_range(first_month, last_month, freq="M"):
+        upper = (period + 1).start_time.strftime("%Y-%m-%d")
+        parts.append(f"    PARTITION p{period.strftime('%Y%m')} VALUES LESS THAN (TO_DAYS('{upper}'))")
+    parts.append("    PARTITION pmax VALUES LESS THAN MAXVALUE")
+    return [
+        "ALTER TABLE claims MODIFY Timestamp DATETIME NOT NULL;",
+        "ALTER TABLE claims DROP PRIMARY KEY, ADD PRIMARY KEY (Claim_ID, Timestamp);",
+        # Keeps MIN/MAX(Timestamp) and range scans to an index lookup per partition
+        "ALTER TABLE claims ADD KEY idx_claims_timestamp (Timestamp);",
+        "ALTER TABLE claims PARTITION BY RANGE (TO_DAYS(Timestamp)) (\n" + ",\n".join(parts) + "\n);",
+        """CREATE TABLE IF NOT EXISTS claims_monthly_summary (
+    Month CHAR(7) NOT NULL,
+    Date DATE NOT NULL,
+    Provider_ID INT NOT NULL,
+    Status VARCHAR(20) NOT NULL,
+    Claims INT NOT NULL,
+    PRIMARY KEY (Month, Date, Provider_ID, Status)
+);""",
+    ]
+
+def mysql_compact_sql(month):
+    # Summarise one cold month. The raw partition is kept: the queries, KPIs,
+    # receiver features and sketches all read raw claims, and only the range
+    # charts read the summary. Re-running for a month (e.g. after late claims)
+    # replaces its summary rows.
+    period = pd.Period(month, freq="M")
+    start = period.start_time.strftime("%Y-%m-%d")
+    end = (period + 1).start_time.strftime("%Y-%m-%d")
+    return [
+        f"DELETE FROM claims_monthly_summary WHERE Month = '{month}';",
+        f"""INSERT INTO claims_monthly_summary (Month, Date, Provider_ID, Status, Claims)
+SELECT '{month}', DATE(c.Timestamp), f.Provider_ID, c.Status, COUNT(*)
+FROM claims c JOIN food_listings f ON c.Food_ID = f.Food_ID
+WHERE c.Timestamp >= '{start}' AND c.Timestamp < '{end}'
+GROUP BY DATE(c.Timestamp), f.Provider_ID, c.Status;""",
+    ]
+
+# -------------------------
+# Parquet store (file backend)
+# -------------------------
+class ClaimsStore:
+    # Layout:
+    #   <root>/raw/month=YYYY-MM/claims.parquet         claims not compacted yet
+    #   <root>/summary/month=YYYY-MM/summary.parquet    compacted claims, daily counts
+    #                                                   per Provider_ID and Status
+    #   <root>/summary/month=YYYY-MM/claim_ids.parquet  Claim_IDs already in the summary
+    #   <root>/archive/month=YYYY-MM/claims.parquet     compacted raw claims (drop_raw=False)
+    #   <root>/bounds.json                              first/last Timestamp, claim count
+    #                                                   and claims_fingerprint of the store
+    # Every claim is in exactly one of raw or summary, so reads add the two;
+    # the archive layer is never read.
+    def __init__(self, root=CLAIMS_PARTITION_DIR):
+        self.root = root
+
+    def _path(self, layer, month):
+        return os.path.join(self.root, layer, f"month={month}")
+
+    def _read(self, layer, month, name):
+        file = os.path.join(self._path(layer, month), name)
+        return pd.read_parquet(file) if os.path.exists(file) else None
+
+    def _write(self, df, layer, month, name):
+        path = self._path(layer, month)
+        os.makedirs(path, exist_ok=True)
+        df.to_parquet(os.path.join(path, name), index=False)
+
+    def _months(self, layer):
+        layer_dir = os.path.join(self.root, layer)
+        if not os.path.isdir(layer_dir):
+            return []
+        return sorted(d.split("=", 1)[1] for d in os.listdir(layer_dir) if d.startswith("month="))
+
+    def exists(self):
+        return self.stats() is not None
+
+    def stats(self):
+        # First/last claim Timestamp, number of claims stored and their fingerprint
+        file = os.path.join(self.root, "bounds.json")
+        if not os.path.exists(file):
+            return None
+        with open(file) as f:
+            stats = json.load(f)
+        return {"first": pd.Timestamp(stats["first"]), "last": pd.Timestamp(stats["last"]),
+                "claims": stats["claims"], "fingerprint": stats.get("fingerprint")}
+
+    def date_range(self):
+        stats = self.stats()
+        return (stats["first"], stats["last"]) if stats else None
+
+    # -------------------------
+    # Writing
+    # -------------------------
+    def write(self, claims):
+        claims = claims.dropna(subset=["Timestamp"]).drop_duplicates("Claim_ID", keep="last")
+        if claims.empty:
+            return
+        stats = self.stats() or {"first": claims["Timestamp"].min(), "last": claims["Timestamp"].max(),
+                                 "claims": 0, "fingerprint": 0}
+        for month, part in claims.groupby(claims["Timestamp"].dt.strftime("%Y-%m")):
+            # Compacted claims are final, so re-writing them (e.g. re-running build) is a no-op
+            compacted_ids = self._read("summary", month, "claim_ids.parquet")
+            if compacted_ids is not None:
+                part = part[~part["Claim_ID"].isin(compacted_ids["Claim_ID"])]
+            if part.empty:
+                continue
+            existing = self._read("raw", month, "claims.parquet")
+            fingerprint = int(claim_hashes(part).sum())
+            if existing is not None:
+                replaced = existing[existing["Claim_ID"].isin(part["Claim_ID"])]
+                stats["claims"] += len(part) - len(replaced)
+                fingerprint -= int(claim_hashes(replaced).sum())
+                part = pd.concat([existing, part]).drop_duplicates("Claim_ID", keep="last")
+            else:
+                stats["claims"] += len(part)
+            stats["fingerprint"] = (stats["fingerprint"] + fingerprint) % _FINGERPRINT_MOD
+            self._write(part, "raw", month, "claims.parquet")
+            stats["first"] = min(stats["first"], part["Timestamp"].min())
+            stats["last"] = max(stats["last"], part["Timestamp"].max())
+        with open(os.path.join(self.root, "bounds.json"), "w") as f:
+            json.dump({"first": stats["first"].isoformat(), "last": stats["last"].isoformat(),
+                       "claims": stats["claims"], "fingerprint": stats["fingerprint"]}, f)
+
+    def compact(self, food_listings, hot_months=HOT_MONTHS, drop_raw=True):
+        # Raw claims in months older than the newest `hot_months` months are
+        # merged into that month's summary and leave the raw layer, so late
+        # claims for an already compacted month are added, not overwritten.
+        # With drop_raw=False they move to the archive layer instead of
+        # being deleted.
+        months = sorted(set(self._months("raw")) | set(self._months("summary")))
+        cold = set(months[:-hot_months] if hot_months else months)
+        compacted = []
+        for month in self._months("raw"):
+            if month not in cold:
+                continue
+            raw = self._read("raw", month, "claims.parquet")
+            summary = summarize(raw, food_listings)
+            claim_ids = raw[["Claim_ID"]]
+            previous = self._read("summary", month, "summary.parquet")
+            if previous is not None:
+                summary = pd.concat([previous, summary]).groupby(
+                    ["Date", "Provider_ID", "Status"], as_index=False)["Claims"].sum()
+                claim_ids = pd.concat([self._read("summary", month, "claim_ids.parquet"), claim_ids])
+            self._write(summary, "summary", month, "summary.parquet")
+            self._write(claim_ids, "summary", month, "claim_ids.parquet")
+            if not drop_raw:
+                archived = self._read("archive", month, "claims.parquet")
+                if archived is not None:
+                    raw = pd.concat([archived, raw])
+                self._write(raw, "archive", month, "claims.parquet")
+            shutil.rmtree(self._path("raw", month))
+            compacted.append(month)
+        return compacted
+
+    # -------------------------
+    # Pruned reads
+    # -------------------------
+    def plan(self, start, end):
+        # start/end are inclusive dates; only partitions whose month overlaps them are read.
+        # A month can be in both layers: its raw partition then only holds
+        # claims that arrived after it was compacted.
+        wanted = set(months_between(start, end))
+        return {
+            "raw": [m for m in self._months("raw") if m in wanted],
+            "summary": [m for m in self._months("summary") if m in wanted],
+        }
+
+    def raw_claims(self, start, end):
+        plan = self.plan(start, end)
+        frames = [pd.read_parquet(os.path.join(self._path("raw", m), "claims.parquet")) for m in plan["raw"]]
+        if not frames:
+            return pd.DataFrame(columns=["Claim_ID", "Food_ID", "Receiver_ID", "Status", "Timestamp"])
+        df = pd.concat(frames, ignore_index=True)
+        start_day, end_day = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+        return df[(df["Timestamp"] >= start_day) & (df["Timestamp"] < end_day + pd.Timedelta(days=1))]
+
+    def daily_summary(self, start, end, food_listings):
+        # Daily claim counts per Provider_ID and Status over [start, end],
+        # from summaries for cold months and raw claims for hot months
+        plan = self.plan(start, end)
+        frames = [pd.read_parquet(os.path.join(self._path("summary", m), "summary.parquet")) for m in plan["summary"]]
+        raw = self.raw_claims(start, end)
+        if not raw.empty:
+            frames.append(summarize(raw, food_listings))
+        if not frames:
+            return pd.DataFrame(columns=SUMMARY_COLUMNS)
+        df = pd.concat(frames, ignore_index=True)
+        start_day, end_day = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+        return df[(df["Date"] >= start_day) & (df["Date"] <= end_day)]
+
+    def status_counts(self, start, end, food_listings):
+        df = self.daily_summary(start, end, food_listings)
+        return df.groupby("Status")["Claims"].sum().reset_index(name="Count")
+
+    def daily_counts(self, start, end, food_listings):
+        df = self.daily_summary(start, end, food_listings)
+        return df.groupby("Date")["Claims"].sum().reset_index(name="Total_Claims").sort_values("Date")
+
+
+def summarize(claims, food_listings):
+    merged = claims.merge(food_listings[["Food_ID", "Provider_ID"]], on="Food_ID", how="left")
+    merged["Date"] = pd.to_datetime(merged["Timestamp"]).dt.normalize()
+    merged["Provider_ID"] = merged["Provider_ID"].fillna(-1).astype(int)
+    return merged.groupby(["Date", "Provider_ID", "Status"]).size().reset_index(name="Claims")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Partition claims by month and compact cold months.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="write Parquet partitions from claims.csv and compact cold months")
+    build.add_argument("--claims", default="claims.csv")
+    build.add_argument("--food-listings", default="food_listings.csv")
+    build.add_argument("--root", default=CLAIMS_PARTITION_DIR)
+    build.add_argument("--hot-months", type=int, default=HOT_MONTHS)
+    ddl = sub.add_parser("mysql-ddl", help="print MySQL statements that range-partition the claims table")
+    ddl.add_argument("first_month")
+    ddl.add_argument("last_month")
+    compact = sub.add_parser("mysql-compact", help="print MySQL statements that compact one month")
+    compact.add_argument("month")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        claims = pd.read_csv(args.claims)
+        claims["Timestamp"] = pd.to_datetime(claims["Timestamp"], errors="coerce")
+        store = ClaimsStore(args.root)
+        store.write(claims)
+        print("compacted:", store.compact(pd.read_csv(args.food_listings), args.hot_months))
+    elif args.command == "mysql-ddl":
+        print("\n".join(mysql_partition_ddl(args.first_month, args.last_month)))
+    else:
+        print("\n".join(mysql_compact_sql(args.month)))
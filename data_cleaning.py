@@ -0,0 +1,164 @@
+# -------------------------
+# Imports
+# -------------------------
+import argparse
+import os
+from multiprocessing import Pool
+
+import numpy as np
+import pandas as pd
+
+# Files above this many rows are cleaned in parallel chunks
+PARALLEL_MIN_ROWS = 200_000
+
+# -------------------------
+# Phone numbers
+# -------------------------
+def normalize_phones(contacts):
+    # "+1-925-283-8901x6297", "001-548-413-4962", "7610421570" -> "+1-XXX-XXX-XXXX".
+    # Digits past the first ten are kept as an extension (the exports drop the "x").
+    # Valid numbers have a NANP area code and exchange (both start with 2-9);
+    # missing or blank contacts come out with Phone_Valid=False.
+    raw = contacts.astype("string").str.strip()
+    # Country/trunk prefixes: "+1", "001" and a bare "1" written before a separator
+    digits = raw.str.replace(r"^(?:\+1|001|1)(?=\D)", "", regex=True).str.replace(r"\D", "", regex=True)
+    # "19252838901": a bare trunk "1" with no separator (NANP area codes never start with 1)
+    digits = digits.mask((digits.str.len() == 11) & digits.str.startswith("1"), digits.str[1:])
+    base = digits.str[:10]
+    extension = digits.str[10:]
+    valid = (base.str.match(r"^[2-9]\d{2}[2-9]\d{6}$") & (extension.str.len() <= 5)).fillna(False).astype(bool)
+    has_extension = (extension != "").fillna(False).astype(bool)
+    formatted = "+1-" + base.str[:3] + "-" + base.str[3:6] + "-" + base.str[6:10]
+    return pd.DataFrame({
+        "Phone": formatted.where(valid),
+        "Phone_Ext": extension.where(valid & has_extension),
+        "Phone_Valid": valid,
+    }, index=contacts.index)
+
+# -------------------------
+# Addresses
+# -------------------------
+# Street is "<number> <name> <suffix>" with an optional Apt./Suite, as in the shipped exports
+_STREET_ADDRESS = (r"^(?P<Street>\d+\s+\S+\s+\S+(?:\s+(?:Apt\.|Suite)\s+\w+)?)\s+"
+                   r"(?P<Address_City>[^,]+),\s+(?P<State>[A-Z]{2})\s+(?P<Zip>\d{5})$")
+# Military addresses: "PSC 0438, Box 0878 APO AE 55216", "USNS Smith FPO AP 12345"
+_MILITARY_ADDRESS = (r"^(?P<Street>.+?)\s+(?P<Address_City>[ADF]PO)\s+"
+                     r"(?P<State>A[AEP])\s+(?P<Zip>\d{5})$")
+
+def split_addresses(addresses):
+    raw = addresses.astype("string").str.strip().str.replace(r"\s+", " ", regex=True)
+    parts = raw.str.extract(_STREET_ADDRESS)
+    military = raw.str.extract(_MILITARY_ADDRESS)
+    parts = parts.fillna(military)
+    parts["Address_Valid"] = parts["Zip"].notna()
+    return parts
+
+# -------------------------
+# Row-level cleaning (vectorized, chunk-safe)
+# -------------------------
+def _clean_chunk(df):
+    df = df.copy()
+    for col in df.select_dtypes(include=["object", "string"]).columns:
+        df[col] = df[col].str.strip()
+    df = df.join(normalize_phones(df["Contact"]))
+    if "Address" in df.columns:
+        df = df.join(split_addresses(df["Address"]))
+    return df
+
+def clean_rows(df, processes=None):
+    df = df.reset_index(drop=True)
+    if len(df) < PARALLEL_MIN_ROWS:
+        return _clean_chunk(df)
+    processes = processes or os.cpu_count() or 1
+    size = -(-len(df) // processes)
+    chunks = [df.iloc[i:i + size] for i in range(0, len(df), size)]
+    with Pool(processes) as pool:
+        return pd.concat(pool.map(_clean_chunk, chunks))
+
+# -------------------------
+# Duplicate detection (blocking)
+# -------------------------
+_COMPANY_WORDS = r"\b(?:inc|llc|ltd|plc|group|and|sons|co|corp|company)\b"
+
+def name_keys(names):
+    key = names.astype("string").str.lower()
+    key = key.str.replace(_COMPANY_WORDS, " ", regex=True).str.replace(r"[^a-z0-9]+", " ", regex=True)
+    # Token order is ignored so "Smith-Jones" and "Jones and Smith" share a block
+    return key.str.split().map(lambda tokens: " ".join(sorted(tokens)) if isinstance(tokens, list) else pd.NA)
+
+def find_duplicates(df, id_col):
+    # Candidate pairs only come from rows sharing a blocking key (normalized
+    # name or phone), never from all pairs. A pair is a duplicate when it
+    # shares the name key and a phone or city, or shares a phone and a city.
+    keyed = df[[id_col, "Name_Key", "Phone", "City"]]
+    pairs = []
+    for block, also in (("Name_Key", ["Phone", "City"]), ("Phone", ["City"])):
+        block_rows = keyed.dropna(subset=[block])
+        cand = block_rows.merge(block_rows, on=block, suffixes=("", "_other"))
+        cand = cand[cand[id_col] < cand[f"{id_col}_other"]]
+        match = np.zeros(len(cand), dtype=bool)
+        for col in also:
+            match |= (cand[col] == cand[f"{col}_other"]).fillna(False).to_numpy()
+        pairs.append(cand.loc[match, [id_col, f"{id_col}_other"]])
+    pairs = pd.concat(pairs).drop_duplicates()
+
+    # Union-find so chains of duplicates share one canonical (lowest) ID
+    parent = {}
+    def find(x):
+        while parent.get(x, x) != x:
+            parent[x] = parent.get(parent[x], parent[x])
+            x = parent[x]
+        return x
+    for a, b in pairs.itertuples(index=False):
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+    return df[id_col].map(find)
+
+# -------------------------
+# Entry points
+# -------------------------
+def clean_entities(df, id_col, processes=None):
+    df = clean_rows(df, processes)
+    df["Name_Key"] = name_keys(df["Name"])
+    df["Canonical_ID"] = find_duplicates(df, id_col)
+    df["Is_Duplicate"] = df["Canonical_ID"] != df[id_col]
+    return df
+
+def clean_providers(providers, processes=None):
+    return clean_entities(providers, "Provider_ID", processes)
+
+def clean_receivers(receivers, processes=None):
+    return clean_entities(receivers, "Receiver_ID", processes)
+
+def quality_report(df):
+    report = {
+        "Rows": len(df),
+        "Invalid phones": int((~df["Phone_Valid"]).sum()),
+        # Trailing digits re-read as an extension; worth a look if unexpectedly high
+        "Phones with extension": int(df["Phone_Ext"].notna().sum()),
+        "Duplicates": int(df["Is_Duplicate"].sum()),
+    }
+    if "Address_Valid" in df.columns:
+        report["Invalid addresses"] = int((~df["Address_Valid"]).sum())
+    return report
+
+def flagged_rows(df):
+    flagged = ~df["Phone_Valid"] | df["Is_Duplicate"]
+    if "Address_Valid" in df.columns:
+        flagged |= ~df["Address_Valid"]
+    return df[flagged]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clean provider/receiver exports before loading them.")
+    parser.add_argument("--providers", default="providers_final.csv")
+    parser.add_argument("--receivers", default="receivers_final.csv")
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    for path, id_col in ((args.providers, "Provider_ID"), (args.receivers, "Receiver_ID")):
+        cleaned = clean_entities(pd.read_csv(path), id_col, args.processes)
+        out = path.replace(".csv", "_clean.csv")
+        cleaned.to_csv(out, index=False)
+        print(out, quality_report(cleaned))
@@ -0,0 +1,232 @@
+# -------------------------
+# Imports
+# -------------------------
+import heapq
+import json
+import logging
+import threading
+from collections import Counter, deque
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+logger = logging.getLogger("expiry_scheduler")
+
+EXPIRING = "expiring"
+EXPIRED = "expired"
+
+# -------------------------
+# Event sinks
+# -------------------------
+def log_sink(event):
+    logger.info("%s: Food_ID=%s Provider_ID=%s Expiry_Date=%s",
+                event["event"], event["Food_ID"], event["Provider_ID"], event["Expiry_Date"])
+
+
+class WebhookSink:
+    # Stub: builds the JSON payload a webhook would receive and keeps it in memory.
+    # Swap send() for a real HTTP POST once an endpoint exists.
+    def __init__(self, url, max_events=500):
+        self.url = url
+        self.sent = deque(maxlen=max_events)
+
+    def send(self, payload):
+        self.sent.append(payload)
+        logger.debug("webhook stub -> %s: %s", self.url, payload)
+
+    def __call__(self, event):
+        self.send(json.dumps(event, default=str))
+
+
+class PanelSink:
+    # Keeps the most recent events for the in-app alerts panel
+    def __init__(self, max_events=50):
+        self._events = deque(maxlen=max_events)
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        with self._lock:
+            self._events.appendleft(event)
+
+    def events(self):
+        with self._lock:
+            return list(self._events)
+
+# -------------------------
+# Scheduler
+# -------------------------
+class ExpiryScheduler:
+    # Listings sit in a min-heap keyed on the time of their next event, so each
+    # tick only pops what is due instead of rescanning all listings.
+    # A listing counts as expired once its Expiry_Date is before today,
+    # matching query_5 (Expiry_Date < CURDATE()).
+    # `refresh(scheduler)` is called from the sweep thread every
+    # `refresh_seconds` so the backing store can add new listings and
+    # drop deleted ones; heap entries for changed listings are skipped lazily.
+    # Listings loaded with notify=False (the initial load) that are already
+    # expired go straight into the expired set, so a restart does not re-send
+    # every historical expiry; only changes seen while running emit events.
+    def __init__(self, warn_hours=24, interval_seconds=60, sinks=None, refresh=None, refresh_seconds=60):
+        self.warn_hours = warn_hours
+        self.interval_seconds = interval_seconds
+        self.sinks = list(sinks or [])
+        self.refresh = refresh
+        self.refresh_seconds = refresh_seconds
+        self.max_food_id = None              # highest Food_ID seen, for polling new rows
+        self._heap = []
+        self._lock = threading.Lock()
+        self._current = {}                   # Food_ID -> (Provider_ID, Expiry_Date)
+        self._expired = {}                   # Food_ID -> Provider_ID
+        self._expired_by_provider = Counter()
+        self._last_refresh = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    def add_listing(self, food_id, provider_id, expiry_date, notify=True, now=None):
+        if expiry_date is None or pd.isna(expiry_date):
+            self.remove_listing(food_id)
+            return
+        expiry_date = pd.Timestamp(expiry_date).normalize()
+        expires_at = expiry_date + timedelta(days=1)
+        warn_at = expires_at - timedelta(hours=self.warn_hours)
+        now = pd.Timestamp(now or datetime.now())
+        with self._lock:
+            if self.max_food_id is None or food_id > self.max_food_id:
+                self.max_food_id = food_id
+            if self._current.get(food_id) == (provider_id, expiry_date):
+                return
+            self._forget_expired(food_id)
+            self._current[food_id] = (provider_id, expiry_date)
+            if not notify and expires_at <= now:
+                self._expired[food_id] = provider_id
+                self._expired_by_provider[provider_id] += 1
+                return
+            if not notify and warn_at <= now:
+                heapq.heappush(self._heap, (expires_at, EXPIRED, food_id, provider_id, expiry_date))
+            else:
+                heapq.heappush(self._heap, (warn_at, EXPIRING, food_id, provider_id, expiry_date))
+        self._wake.set()
+
+    def remove_listing(self, food_id):
+        with self._lock:
+            self._current.pop(food_id, None)
+            self._forget_expired(food_id)
+
+    def sync(self, food_listings):
+        # Reconcile with a full Food_ID, Provider_ID, Expiry_Date snapshot:
+        # deleted listings are dropped and edited expiry dates rescheduled
+        food_ids = set(food_listings["Food_ID"])
+        with self._lock:
+            for food_id in [f for f in self._current if f not in food_ids]:
+                del self._current[food_id]
+                self._forget_expired(food_id)
+        self.load(food_listings)
+
+    def _forget_expired(self, food_id):
+        provider_id = self._expired.pop(food_id, None)
+        if provider_id is not None:
+            self._expired_by_provider[provider_id] -= 1
+            if self._expired_by_provider[provider_id] <= 0:
+                del self._expired_by_provider[provider_id]
+
+    def load(self, food_listings, notify=True):
+        now = pd.Timestamp.now()
+        rows = food_listings[["Food_ID", "Provider_ID", "Expiry_Date"]]
+        for food_id, provider_id, expiry_date in rows.itertuples(index=False):
+            self.add_listing(food_id, provider_id, expiry_date, notify, now)
+
+    def tick(self, now=None):
+        now = pd.Timestamp(now or datetime.now())
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                _, kind, food_id, provider_id, expiry_date = heapq.heappop(self._heap)
+                # Stale entry: the listing was removed or its expiry changed
+                if self._current.get(food_id) != (provider_id, expiry_date):
+                    continue
+                if kind == EXPIRING:
+                    expires_at = expiry_date + timedelta(days=1)
+                    heapq.heappush(self._heap, (expires_at, EXPIRED, food_id, provider_id, expiry_date))
+                    # Listings loaded after their expiry skip straight to "expired"
+                    if expires_at <= now:
+                        continue
+                else:
+                    self._expired[food_id] = provider_id
+                    self._expired_by_provider[provider_id] += 1
+                due.append({
+                    "event": kind,
+                    "Food_ID": food_id,
+                    "Provider_ID": provider_id,
+                    "Expiry_Date": expiry_date.date(),
+                    "at": now,
+                })
+        for event in due:
+            self._emit(event)
+        return due
+
+    def _emit(self, event):
+        for sink in self.sinks:
+            try:
+                sink(event)
+            except Exception:
+                logger.exception("expiry sink %r failed", sink)
+
+    def next_due(self):
+        with self._lock:
+            return self._heap[0][0] if self._heap else None
+
+    # -------------------------
+    # Live expired set
+    # -------------------------
+    def expired_ids(self):
+        with self._lock:
+            return set(self._expired)
+
+    def expired_by_provider(self):
+        with self._lock:
+            return dict(self._expired_by_provider)
+
+    # -------------------------
+    # Background thread
+    # -------------------------
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            self._maybe_refresh()
+            self.tick()
+            wait = self.interval_seconds
+            next_due = self.next_due()
+            if next_due is not None:
+                wait = min(wait, max((next_due - pd.Timestamp.now()).total_seconds(), 0))
+            if self.refresh is not None:
+                wait = min(wait, self.refresh_seconds)
+            self._wake.wait(wait)
+
+    def _maybe_refresh(self):
+        if self.refresh is None:
+            return
+        now = pd.Timestamp.now()
+        if self._last_refresh is not None and (now - self._last_refresh).total_seconds() < self.refresh_seconds:
+            return
+        self._last_refresh = now
+        try:
+            self.refresh(self)
+        except Exception:
+            logger.exception("expiry refresh failed")
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="expiry-sweep", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
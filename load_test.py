@@ -0,0 +1,387 @@
+# -------------------------
+# Imports
+# -------------------------
+import argparse
+import ast
+import json
+import math
+import os
+import random
+import resource
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest
+
+# -------------------------
+# Widget paths per page
+# -------------------------
+# (page, selectbox label, button label or None when selecting alone renders the result)
+WIDGET_PATHS = [
+    ("Dashboard", "Select a table to view:", "Generate Table"),
+    ("Queries", "Choose a question:", "Generate Answer"),
+    ("Data Visualization", "Select Visualization:", None),
+]
+
+# -------------------------
+# Latency recording
+# -------------------------
+class Recorder:
+    def __init__(self):
+        self.samples = defaultdict(list)    # action -> seconds
+        self.errors = defaultdict(int)
+        self.failures = Counter()           # (action, message) -> occurrences
+        self._lock = threading.Lock()
+
+    def fail(self, action, message):
+        with self._lock:
+            self.errors[action] += 1
+            self.failures[(action, message.strip().splitlines()[-1][:200] if message.strip() else "")] += 1
+
+    def timed(self, action, at, step):
+        start = time.perf_counter()
+        message = None
+        try:
+            step()
+            at.run()
+            if at.exception:
+                message = at.exception[0].message
+            elif at.error:
+                message = at.error[0].value
+        except Exception as e:
+            message = f"{type(e).__name__}: {e}"
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.samples[action].append(elapsed)
+        if message is not None:
+            self.fail(action, message)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    # Nearest-rank percentile
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+# -------------------------
+# Resource sampling
+# -------------------------
+def _avg(values):
+    return round(sum(values) / len(values), 1) if values else None
+
+def _max(values):
+    return round(max(values), 1) if values else None
+
+
+class ResourceSampler:
+    # CPU and memory of this process, which hosts every simulated session
+    def __init__(self, interval=0.5):
+        self.interval = interval
+        self.cpu_percent = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _cpu_seconds(self):
+        return sum(os.times()[:2])
+
+    def _sample(self):
+        pass
+
+    def _run(self):
+        last_wall, last_cpu = time.perf_counter(), self._cpu_seconds()
+        while not self._stop.wait(self.interval):
+            wall, cpu = time.perf_counter(), self._cpu_seconds()
+            self.cpu_percent.append(100.0 * (cpu - last_cpu) / (wall - last_wall))
+            last_wall, last_cpu = wall, cpu
+            self._sample()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        return {
+            "cpu_avg_percent": _avg(self.cpu_percent),
+            "cpu_max_percent": _max(self.cpu_percent),
+            "max_rss_mb": round(usage.ru_maxrss / 1024, 1),
+            "load_avg_1m": round(os.getloadavg()[0], 2),
+        }
+
+
+class ProcessSampler(ResourceSampler):
+    # CPU and resident memory of another process, e.g. mysqld (--server-pid); Linux /proc only
+    def __init__(self, pid, interval=0.5):
+        super().__init__(interval)
+        self.pid = pid
+        self.rss_mb = []
+        self._ticks = os.sysconf("SC_CLK_TCK")
+
+    def _cpu_seconds(self):
+        with open(f"/proc/{self.pid}/stat") as f:
+            # Fields after the ")" closing the command name; utime and stime are 14th and 15th
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / self._ticks
+
+    def _sample(self):
+        with open(f"/proc/{self.pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    self.rss_mb.append(int(line.split()[1]) / 1024)
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return {
+            "pid": self.pid,
+            "cpu_avg_percent": _avg(self.cpu_percent),
+            "cpu_max_percent": _max(self.cpu_percent),
+            "max_rss_mb": _max(self.rss_mb),
+        }
+
+
+class MySQLStatusSampler:
+    # Server-side load from SHOW GLOBAL STATUS, for --app app.py. Uses its own
+    # connection, which shows up as one of the Threads_connected.
+    VARIABLES = ("Threads_connected", "Threads_running", "Questions", "Slow_queries", "Max_used_connections")
+
+    def __init__(self, settings, interval=1.0):
+        import mysql.connector      # only needed when load-testing the MySQL app
+        self.interval = interval
+        self.samples = []           # (seconds, {variable: value})
+        self._conn = mysql.connector.connect(**settings)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _status(self):
+        cursor = self._conn.cursor()
+        names = ", ".join(f"'{v}'" for v in self.VARIABLES)
+        cursor.execute(f"SHOW GLOBAL STATUS WHERE Variable_name IN ({names})")
+        status = {name: int(value) for name, value in cursor.fetchall()}
+        cursor.close()
+        return time.perf_counter(), status
+
+    def _run(self):
+        self.samples.append(self._status())
+        while not self._stop.wait(self.interval):
+            self.samples.append(self._status())
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.samples.append(self._status())
+        self._conn.close()
+        (t0, first), (t1, last) = self.samples[0], self.samples[-1]
+        # Each sample is itself one statement; leave those out of the query rate
+        questions = last["Questions"] - first["Questions"] - (len(self.samples) - 1)
+        connected = [s["Threads_connected"] for _, s in self.samples]
+        running = [s["Threads_running"] for _, s in self.samples]
+        return {
+            "queries_per_s": round(questions / (t1 - t0), 1) if t1 > t0 else None,
+            "slow_queries": last["Slow_queries"] - first["Slow_queries"],
+            "threads_connected_avg": _avg(connected),
+            "threads_connected_max": max(connected),
+            "threads_running_max": max(running),
+            "max_used_connections": last["Max_used_connections"],
+        }
+
+
+def mysql_settings(app_path):
+    # Literal keyword arguments of the app's mysql.connector.connect(...) call
+    with open(app_path) as f:
+        tree = ast.parse(f.read())
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "connect":
+            try:
+                return {kw.arg: ast.literal_eval(kw.value) for kw in node.keywords}
+            except ValueError:
+                continue
+    return None
+
+# -------------------------
+# Simulated session
+# -------------------------
+def share_runtime_across_sessions():
+    # AppTest assumes one test at a time. Two things break with sessions in
+    # parallel threads, which a real server does not hit:
+    # - run() installs a mock Runtime singleton and clears it when it returns,
+    #   mid-way through other sessions' runs (widget-state KeyErrors), so fall
+    #   back to the most recent mock;
+    # - every run recompiles the script, and concurrent ast.parse calls can
+    #   fail on CPython 3.11 ("AST constructor recursion depth mismatch",
+    #   an empty page), so compile one script at a time.
+    last = [None]
+    compile_lock = threading.Lock()
+    get_bytecode = ScriptCache.get_bytecode
+
+    def locked_get_bytecode(self, script_path):
+        with compile_lock:
+            return get_bytecode(self, script_path)
+
+    def instance(cls):
+        if cls._instance is not None:
+            last[0] = cls._instance
+        if last[0] is None:
+            raise RuntimeError("Runtime hasn't been created!")
+        return last[0]
+
+    def exists(cls):
+        return cls._instance is not None or last[0] is not None
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(exists)
+    ScriptCache.get_bytecode = locked_get_bytecode
+
+def find_widget(widgets, label):
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    raise LookupError(f"no widget {label!r} (found {[w.label for w in widgets]})")
+
+def run_session(app_path, recorder, rounds, options_per_path, timeout, seed):
+    try:
+        walk_session(app_path, recorder, rounds, options_per_path, timeout, seed)
+    except Exception as e:
+        # A page that failed to render has no widgets left to drive
+        recorder.fail("Session aborted", f"{type(e).__name__}: {e}")
+
+def walk_session(app_path, recorder, rounds, options_per_path, timeout, seed):
+    rng = random.Random(seed)
+    # A new AppTest is a new browser session: it re-runs create_connection() and the KPI counts
+    at = AppTest.from_file(app_path, default_timeout=timeout)
+    recorder.timed("Open app", at, lambda: None)
+
+    for _ in range(rounds):
+        for page, select_label, button_label in WIDGET_PATHS:
+            radio = at.sidebar.radio[0]
+            recorder.timed(f"{page}: open page", at, lambda: radio.set_value(page))
+
+            options = list(find_widget(at.selectbox, select_label).options)
+            if options_per_path:
+                options = rng.sample(options, min(options_per_path, len(options)))
+            for option in options:
+                select = find_widget(at.selectbox, select_label)
+                if button_label is None:
+                    recorder.timed(f"{page}: {option}", at, lambda: select.set_value(option))
+                    continue
+                recorder.timed(f"{page}: select", at, lambda: select.set_value(option))
+                button = find_widget(at.button, button_label)
+                recorder.timed(f"{page}: {button_label} [{option}]", at, button.click)
+
+# -------------------------
+# Report
+# -------------------------
+def summarize(recorder, wall_seconds, sessions, resources, server=None):
+    rows = []
+    all_samples = []
+    for action, samples in sorted(recorder.samples.items()):
+        all_samples.extend(samples)
+        rows.append({
+            "action": action,
+            "count": len(samples),
+            "errors": recorder.errors[action],
+            "p50_ms": round(percentile(samples, 50) * 1000, 1),
+            "p95_ms": round(percentile(samples, 95) * 1000, 1),
+            "p99_ms": round(percentile(samples, 99) * 1000, 1),
+            "max_ms": round(max(samples) * 1000, 1),
+        })
+    overall = {
+        "sessions": sessions,
+        "actions": len(all_samples),
+        "errors": sum(recorder.errors.values()),
+        "wall_seconds": round(wall_seconds, 2),
+        "throughput_per_s": round(len(all_samples) / wall_seconds, 2) if wall_seconds else None,
+        "p50_ms": round(percentile(all_samples, 50) * 1000, 1) if all_samples else None,
+        "p95_ms": round(percentile(all_samples, 95) * 1000, 1) if all_samples else None,
+        "p99_ms": round(percentile(all_samples, 99) * 1000, 1) if all_samples else None,
+    }
+    failures = [{"action": action, "message": message, "count": count}
+                for (action, message), count in recorder.failures.most_common()]
+    report = {"overall": overall, "resources": resources, "actions": rows, "failures": failures}
+    report.update(server or {})
+    return report
+
+def print_report(report, baseline=None):
+    print(f"{'action':<70} {'count':>6} {'err':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for row in report["actions"]:
+        print(f"{row['action'][:70]:<70} {row['count']:>6} {row['errors']:>4} "
+              f"{row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9} {row['max_ms']:>9}")
+    if report["failures"]:
+        print()
+        for failure in report["failures"][:20]:
+            print(f"{failure['count']:>6}x {failure['action'][:40]}: {failure['message']}")
+    print()
+    for section in ("overall", "resources", "server_process", "mysql_status"):
+        if section not in report:
+            continue
+        if section != "overall":
+            print(f"[{section}]")
+        for key, value in report[section].items():
+            line = f"{key:<20} {value}"
+            # Compare against a saved run, e.g. before a data-layer change
+            before = (baseline or {}).get(section, {}).get(key)
+            if isinstance(value, (int, float)) and isinstance(before, (int, float)) and before:
+                line += f"  (baseline {before}, {100.0 * (value - before) / before:+.1f}%)"
+            print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drive the dashboard with N concurrent simulated sessions.")
+    parser.add_argument("--app", default="app_csv.py", help="app_csv.py (CSV backend) or app.py (local MySQL)")
+    parser.add_argument("--sessions", type=int, default=10, help="concurrent sessions")
+    parser.add_argument("--rounds", type=int, default=1, help="times each session walks every widget path")
+    parser.add_argument("--options", type=int, default=0, help="random options per widget path (0 = all)")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="seconds over which sessions start")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-run script timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write the report as JSON")
+    parser.add_argument("--baseline", help="JSON report from an earlier run to compare against")
+    parser.add_argument("--server-pid", type=int, help="also sample CPU/memory of this process (e.g. mysqld)")
+    parser.add_argument("--no-mysql-status", action="store_true",
+                        help="skip SHOW GLOBAL STATUS sampling when the app connects to MySQL")
+    args = parser.parse_args()
+
+    app_path = os.path.abspath(args.app)
+    # The apps read their CSVs from the working directory
+    os.chdir(os.path.dirname(app_path))
+
+    share_runtime_across_sessions()
+    recorder = Recorder()
+    server_samplers = {}
+    if args.server_pid:
+        server_samplers["server_process"] = ProcessSampler(args.server_pid).start()
+    settings = None if args.no_mysql_status else mysql_settings(app_path)
+    if settings:
+        server_samplers["mysql_status"] = MySQLStatusSampler(settings).start()
+    sampler = ResourceSampler().start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+        futures = []
+        for i in range(args.sessions):
+            if args.ramp_up and i:
+                time.sleep(args.ramp_up / args.sessions)
+            futures.append(pool.submit(run_session, app_path, recorder, args.rounds, args.options,
+                                       args.timeout, args.seed + i))
+        for future in futures:
+            future.result()
+    report = summarize(recorder, time.perf_counter() - started, args.sessions, sampler.stop(),
+                       {name: s.stop() for name, s in server_samplers.items()})
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
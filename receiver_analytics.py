@@ -0,0 +1,64 @@
+# -------------------------
+# Imports
+# -------------------------
+import pandas as pd
+
+STATUSES = ["Completed", "Pending", "Cancelled"]
+
+# -------------------------
+# Per-receiver feature table
+# -------------------------
+def receiver_features(receivers, claims, food_listings):
+    # One row per receiver: claims per status, completion/cancellation share,
+    # average gap between claims and the most claimed Food_Type.
+    merged = claims.merge(food_listings[["Food_ID", "Food_Type"]], on="Food_ID", how="left")
+    merged["Timestamp"] = pd.to_datetime(merged["Timestamp"], errors="coerce")
+    merged = merged.sort_values(["Receiver_ID", "Timestamp"])
+    merged["Gap_Days"] = merged.groupby("Receiver_ID")["Timestamp"].diff().dt.total_seconds() / 86400
+
+    grouped = merged.groupby("Receiver_ID")
+    features = grouped.agg(
+        Total_Claims=("Claim_ID", "count"),
+        First_Claim=("Timestamp", "min"),
+        Last_Claim=("Timestamp", "max"),
+        Avg_Days_Between_Claims=("Gap_Days", "mean"),
+    )
+
+    status_counts = merged.groupby(["Receiver_ID", "Status"]).size().unstack(fill_value=0)
+    status_counts = status_counts.reindex(columns=STATUSES, fill_value=0)
+    features = features.join(status_counts)
+    features["Completion_Rate"] = features["Completed"] / features["Total_Claims"]
+    features["Cancelled_Share"] = features["Cancelled"] / features["Total_Claims"]
+
+    food_counts = merged.groupby(["Receiver_ID", "Food_Type"]).size()
+    favorite = food_counts.sort_values(ascending=False).reset_index().drop_duplicates("Receiver_ID")
+    features = features.join(favorite.set_index("Receiver_ID")["Food_Type"].rename("Favorite_Food_Type"))
+
+    # Receivers who never claimed still get a row
+    df = receivers[["Receiver_ID", "Name", "Type", "City"]].merge(features.reset_index(), on="Receiver_ID", how="left")
+    count_cols = ["Total_Claims"] + STATUSES
+    df[count_cols] = df[count_cols].fillna(0).astype(int)
+    df["Avg_Days_Between_Claims"] = df["Avg_Days_Between_Claims"].round(2)
+    return df
+
+# -------------------------
+# Canned receiver queries
+# -------------------------
+def most_cancelled(features, min_claims=2, n=20):
+    df = features[features["Total_Claims"] >= min_claims]
+    return df.sort_values(["Cancelled_Share", "Cancelled"], ascending=False).head(n)[
+        ["Name", "Type", "City", "Total_Claims", "Cancelled", "Cancelled_Share"]]
+
+def most_active(features, n=10):
+    return features.sort_values("Total_Claims", ascending=False).head(n)[
+        ["Name", "Type", "City", "Total_Claims", "Completed", "Completion_Rate", "Avg_Days_Between_Claims"]]
+
+def status_by_type(features):
+    df = features.groupby("Type")[["Total_Claims"] + STATUSES].sum().reset_index()
+    df["Cancelled_Share"] = df["Cancelled"] / df["Total_Claims"]
+    return df.sort_values("Cancelled_Share", ascending=False)
+
+def favorite_food_by_type(features):
+    df = features.dropna(subset=["Favorite_Food_Type"])
+    return df.groupby(["Type", "Favorite_Food_Type"]).size().reset_index(name="Receivers").sort_values(
+        ["Type", "Receivers"], ascending=[True, False])
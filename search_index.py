@@ -0,0 +1,177 @@
+# -------------------------
+# Imports
+# -------------------------
+import math
+import re
+import threading
+from array import array
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+# -------------------------
+# Trigram helpers
+# -------------------------
+_WORD = re.compile(r"[a-z0-9]+")
+
+def trigrams(text):
+    # Each word is padded so prefixes ("  b", " br") score higher than mid-word hits
+    grams = set()
+    for word in _WORD.findall(str(text).lower()):
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+# -------------------------
+# Inverted index
+# -------------------------
+_NO_EXPIRY = np.iinfo(np.int64).min
+
+class SearchIndex:
+    # In-memory trigram index over listings, providers and receivers.
+    # Ranking is the share of query trigrams a document contains, so small
+    # typos still match; shorter documents win ties.
+    # Postings and the per-doc fields used for ranking and filtering are
+    # flat arrays, so a lookup counts, filters and picks the top hits with
+    # numpy and only builds result dicts for the hits it returns.
+    def __init__(self, max_posting_share=0.2):
+        self.max_posting_share = max_posting_share
+        self._postings = defaultdict(lambda: array("I"))   # trigram -> sorted doc numbers
+        self._docs = []                      # doc number -> (kind, id, label, attrs)
+        self._n_grams = array("I")           # doc number -> trigram count
+        self._kind = array("H")              # doc number -> code of kind
+        self._food_type = array("H")         # doc number -> code of Food_Type
+        self._meal_type = array("H")         # doc number -> code of Meal_Type
+        self._expiry = array("q")            # doc number -> Expiry_Date in ns, or _NO_EXPIRY
+        self._codes = {None: 0}              # value -> code for the coded fields
+        self.last_ids = {}                   # kind -> highest ID added, for polling new rows
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def _code(self, value):
+        return self._codes.setdefault(value, len(self._codes))
+
+    def add(self, kind, doc_id, label, text, **attrs):
+        grams = trigrams(text)
+        if not grams:
+            return
+        expiry = attrs.get("Expiry_Date")
+        with self._lock:
+            doc = len(self._docs)
+            self._docs.append((kind, doc_id, label, attrs))
+            self._n_grams.append(len(grams))
+            self._kind.append(self._code(kind))
+            self._food_type.append(self._code(attrs.get("Food_Type")))
+            self._meal_type.append(self._code(attrs.get("Meal_Type")))
+            self._expiry.append(expiry.value if expiry is not None else _NO_EXPIRY)
+            if kind not in self.last_ids or doc_id > self.last_ids[kind]:
+                self.last_ids[kind] = doc_id
+            for gram in grams:
+                self._postings[gram].append(doc)
+
+    # -------------------------
+    # Bulk loaders (also used for incremental rows)
+    # -------------------------
+    def add_providers(self, providers):
+        for row in providers.itertuples(index=False):
+            self.add("Provider", row.Provider_ID, row.Name,
+                     f"{row.Name} {row.Address} {row.City}", City=row.City)
+
+    def add_receivers(self, receivers):
+        for row in receivers.itertuples(index=False):
+            self.add("Receiver", row.Receiver_ID, row.Name,
+                     f"{row.Name} {row.City}", City=row.City)
+
+    def add_listings(self, food_listings, providers):
+        names = providers.set_index("Provider_ID")["Name"]
+        for row in food_listings.itertuples(index=False):
+            provider_name = names.get(row.Provider_ID, "")
+            self.add("Listing", row.Food_ID, f"{row.Food_Name} ({provider_name})",
+                     f"{row.Food_Name} {row.Location} {provider_name}",
+                     Food_Type=str(row.Food_Type).strip(), Meal_Type=str(row.Meal_Type).strip(),
+                     Expiry_Date=pd.Timestamp(row.Expiry_Date) if pd.notna(row.Expiry_Date) else None)
+
+    # -------------------------
+    # Lookup
+    # -------------------------
+    def search(self, query, limit=20, kinds=None, food_type=None, meal_type=None,
+               expires_after=None, expires_before=None, min_score=0.5):
+        grams = trigrams(query)
+        if not grams:
+            return []
+        filtered = any(f is not None for f in (food_type, meal_type, expires_after, expires_before))
+        expires_after = pd.Timestamp(expires_after) if expires_after is not None else None
+        expires_before = pd.Timestamp(expires_before) if expires_before is not None else None
+
+        with self._lock:
+            n_docs = len(self._docs)
+            # Rarest trigrams first. A doc scoring >= min_score shares at least
+            # `needed` grams, so it appears in at least one of the rarest
+            # len(grams) - needed + 1 lists (empty lists from typos included).
+            # Those lists seed the counts; a later list that is very common is
+            # only probed (a binary search per candidate) when the candidates
+            # are few next to it, otherwise it is counted like the rest.
+            postings = sorted((np.frombuffer(self._postings[g], dtype=np.uint32) if g in self._postings
+                               else np.empty(0, dtype=np.uint32) for g in grams), key=len)
+            needed = max(1, math.ceil(min_score * len(grams) - 1e-9))
+            seed_lists = len(grams) - needed + 1
+            cap = max(1, int(n_docs * self.max_posting_share))
+            counts = np.bincount(np.concatenate(postings[:seed_lists]), minlength=n_docs)
+            candidates = None
+            counted = []
+            for docs in postings[seed_lists:]:
+                if len(docs) > cap and candidates is None:
+                    candidates = np.flatnonzero(counts)
+                if len(docs) > cap and len(candidates) * 8 < len(docs):
+                    pos = np.minimum(np.searchsorted(docs, candidates), len(docs) - 1)
+                    counts[candidates[docs[pos] == candidates]] += 1
+                else:
+                    counted.append(docs)
+            if counted:
+                counts += np.bincount(np.concatenate(counted), minlength=n_docs)
+
+            mask = counts >= needed
+            if kinds is not None:
+                mask &= np.isin(np.frombuffer(self._kind, dtype=np.uint16),
+                                [self._codes[k] for k in kinds if k in self._codes])
+            if filtered:
+                mask &= np.frombuffer(self._kind, dtype=np.uint16) == self._codes.get("Listing", -1)
+                if food_type is not None:
+                    mask &= np.frombuffer(self._food_type, dtype=np.uint16) == self._codes.get(food_type, -1)
+                if meal_type is not None:
+                    mask &= np.frombuffer(self._meal_type, dtype=np.uint16) == self._codes.get(meal_type, -1)
+                expiry = np.frombuffer(self._expiry, dtype=np.int64)
+                if expires_after is not None:
+                    mask &= (expiry != _NO_EXPIRY) & (expiry >= expires_after.value)
+                if expires_before is not None:
+                    mask &= (expiry != _NO_EXPIRY) & (expiry <= expires_before.value)
+
+            # Best score first, then fewest trigrams: only the top `limit` are sorted
+            hits = np.flatnonzero(mask)
+            n_grams = np.frombuffer(self._n_grams, dtype=np.uint32)[hits].astype(np.int64)
+            rank = counts[hits] * (int(n_grams.max(initial=0)) + 1) - n_grams
+            if len(hits) > limit:
+                top = np.argpartition(-rank, limit - 1)[:limit] if limit > 0 else []
+                hits, rank = hits[top], rank[top]
+            hits = hits[np.argsort(-rank, kind="stable")]
+            results = []
+            for doc, shared in zip(hits.tolist(), counts[hits].tolist()):
+                kind, doc_id, label, attrs = self._docs[doc]
+                results.append({"Type": kind, "ID": doc_id, "Match": label,
+                                "Score": round(shared / len(grams), 3), **attrs})
+        return results
+
+    def search_df(self, query, **kwargs):
+        return pd.DataFrame(self.search(query, **kwargs))
+
+
+def build_index(providers, receivers, food_listings):
+    index = SearchIndex()
+    index.add_listings(food_listings, providers)
+    index.add_providers(providers)
+    index.add_receivers(receivers)
+    return index
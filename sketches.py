@@ -0,0 +1,231 @@
+# -------------------------
+# Imports
+# -------------------------
+import hashlib
+import heapq
+import itertools
+import math
+import threading
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+
+import pandas as pd
+
+# -------------------------
+# Hashing
+# -------------------------
+def hash64(value):
+    return int.from_bytes(hashlib.blake2b(str(value).encode(), digest_size=8).digest(), "big")
+
+# -------------------------
+# HyperLogLog (distinct counts)
+# -------------------------
+class HyperLogLog:
+    # The register sum is kept up to date on every add, so estimate() is O(1).
+    # Small sketches keep only their non-zero registers in a sorted array
+    # (4 bytes each) and switch to the dense m-byte form once that stops
+    # being smaller, so a provider with a handful of receivers costs bytes,
+    # not 16 KB.
+    def __init__(self, precision=14):
+        self.p = precision
+        self.m = 1 << precision
+        self.registers = None            # dense bytearray once densified
+        self._sparse = array("I")        # sorted (index << 6 | rank) while sparse
+        self._inv_sum = float(self.m)   # sum of 2**-register
+        self._zeros = self.m
+        self.alpha = 0.7213 / (1 + 1.079 / self.m)
+
+    @property
+    def std_error(self):
+        return 1.04 / math.sqrt(self.m)
+
+    def add(self, value):
+        h = hash64(value)
+        idx = h >> (64 - self.p)
+        rest = h & ((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if self.registers is None:
+            self._add_sparse(idx, rank)
+            return
+        old = self.registers[idx]
+        if rank > old:
+            self.registers[idx] = rank
+            self._inv_sum += 2.0 ** -rank - 2.0 ** -old
+            if old == 0:
+                self._zeros -= 1
+
+    def _add_sparse(self, idx, rank):
+        key = idx << 6
+        pos = bisect_left(self._sparse, key)
+        if pos < len(self._sparse) and self._sparse[pos] >> 6 == idx:
+            old = self._sparse[pos] & 63
+            if rank > old:
+                self._sparse[pos] = key | rank
+                self._inv_sum += 2.0 ** -rank - 2.0 ** -old
+            return
+        self._sparse.insert(pos, key | rank)
+        self._inv_sum += 2.0 ** -rank - 1.0
+        self._zeros -= 1
+        if len(self._sparse) > self.m // 8:
+            self._densify()
+
+    def _densify(self):
+        self.registers = bytearray(self.m)
+        for entry in self._sparse:
+            self.registers[entry >> 6] = entry & 63
+        self._sparse = array("I")
+
+    def estimate(self):
+        raw = self.alpha * self.m * self.m / self._inv_sum
+        # Linear counting is more accurate for small cardinalities
+        if raw <= 2.5 * self.m and self._zeros:
+            return self.m * math.log(self.m / self._zeros)
+        return raw
+
+# -------------------------
+# Space-Saving (top-k counts)
+# -------------------------
+class SpaceSaving:
+    # Tracks at most `capacity` items. Each reported count overestimates the
+    # true count by at most its `error`, and never by more than total / capacity;
+    # counts are exact while there are no more distinct items than `capacity`.
+    # The minimum is found with a heap: every count change pushes a new entry
+    # and outdated entries are skipped when popped, so eviction is O(log k).
+    def __init__(self, capacity=200):
+        self.capacity = capacity
+        self.counts = {}    # item -> [count, error]
+        self.total = 0
+        self._heap = []     # (count, seq, item), possibly outdated
+        self._seq = itertools.count()
+
+    def _push(self, item, count):
+        heapq.heappush(self._heap, (count, next(self._seq), item))
+        # Outdated entries pile up on hot items; rebuild once they dominate
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(c, next(self._seq), i) for i, (c, _) in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self):
+        while True:
+            count, _, item = heapq.heappop(self._heap)
+            entry = self.counts.get(item)
+            if entry is not None and entry[0] == count:
+                del self.counts[item]
+                return count
+
+    def add(self, item, weight=1):
+        self.total += weight
+        entry = self.counts.get(item)
+        if entry is not None:
+            entry[0] += weight
+        elif len(self.counts) < self.capacity:
+            entry = self.counts[item] = [weight, 0]
+        else:
+            floor = self._pop_min()
+            entry = self.counts[item] = [floor + weight, floor]
+        self._push(item, entry[0])
+
+    @property
+    def max_error(self):
+        return self.total / self.capacity
+
+    def top(self, k):
+        # Ranked by the guaranteed count (count - error). Items whose guaranteed
+        # count does not exceed their error could be anywhere in the ranking,
+        # so they are left out rather than reported as leaders.
+        ranked = sorted(self.counts.items(), key=lambda kv: (kv[1][0] - kv[1][1], kv[1][0]), reverse=True)
+        return [(item, count, error) for item, (count, error) in ranked[:k] if count - error > error]
+
+# -------------------------
+# Streaming claim statistics
+# -------------------------
+class ApproxClaimStats:
+    # Sketches behind the approximate versions of queries 3, 4, 7 and 11.
+    # `capacity` should be at least the number of distinct providers (see
+    # capacity_for); below that the top-k counts carry an overcount.
+    # Claims that arrive Pending are remembered by Claim_ID so a later
+    # change to Completed can still be counted (update_statuses).
+    def __init__(self, precision=14, capacity=200):
+        self.precision = precision
+        self.receivers = defaultdict(lambda: HyperLogLog(self.precision))
+        self.listings = SpaceSaving(capacity)
+        self.claims = SpaceSaving(capacity)
+        self.completed = SpaceSaving(capacity)
+        self.pending = {}         # Claim_ID -> Provider_ID for claims still Pending
+        self.last_food_id = 0     # highest IDs fed in, for polling new rows
+        self.last_claim_id = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def capacity_for(provider_ids, headroom=2):
+        # Room for every current provider plus growth, so top-k stays exact
+        return max(200, headroom * pd.Series(provider_ids).nunique())
+
+    def add_listing(self, provider_id):
+        with self._lock:
+            self.listings.add(provider_id)
+
+    def add_claim(self, provider_id, receiver_id, status, claim_id=None):
+        with self._lock:
+            self.receivers[provider_id].add(receiver_id)
+            self.claims.add(provider_id)
+            if status == "Completed":
+                self.completed.add(provider_id)
+            elif status == "Pending" and claim_id is not None:
+                self.pending[claim_id] = provider_id
+
+    def oldest_pending(self):
+        with self._lock:
+            return min(self.pending) if self.pending else None
+
+    def update_statuses(self, claims):
+        # Claim_ID, Status rows; Pending claims that have since completed are counted
+        with self._lock:
+            for claim_id, status in claims[["Claim_ID", "Status"]].itertuples(index=False):
+                if status == "Pending" or claim_id not in self.pending:
+                    continue
+                provider_id = self.pending.pop(claim_id)
+                if status == "Completed":
+                    self.completed.add(provider_id)
+
+    def add_listings(self, food_listings):
+        # Food_ID, Provider_ID rows
+        for food_id, provider_id in food_listings[["Food_ID", "Provider_ID"]].itertuples(index=False):
+            self.add_listing(provider_id)
+            self.last_food_id = max(self.last_food_id, int(food_id))
+
+    def add_claims(self, claims):
+        # Claim_ID, Provider_ID, Receiver_ID, Status rows
+        for claim_id, provider_id, receiver_id, status in claims[
+                ["Claim_ID", "Provider_ID", "Receiver_ID", "Status"]].itertuples(index=False):
+            self.add_claim(provider_id, receiver_id, status, claim_id)
+            self.last_claim_id = max(self.last_claim_id, int(claim_id))
+
+    def load(self, food_listings, claims):
+        self.add_listings(food_listings)
+        self.add_claims(claims.merge(food_listings[["Food_ID", "Provider_ID"]], on="Food_ID"))
+
+    # -------------------------
+    # Approximate answers
+    # -------------------------
+    def top_k(self, sketch_name, k, value_name):
+        with self._lock:
+            sketch = getattr(self, sketch_name)
+            rows = sketch.top(k)
+        return pd.DataFrame(rows, columns=["Provider_ID", value_name, "Max_Overcount"])
+
+    def unique_receivers(self, k):
+        with self._lock:
+            rows = [(provider_id, round(hll.estimate())) for provider_id, hll in self.receivers.items()]
+        df = pd.DataFrame(rows, columns=["Provider_ID", "Unique_Receivers"])
+        return df.sort_values("Unique_Receivers", ascending=False).head(k)
+
+    def error_bounds(self):
+        # Bounds shown next to approximate answers in the UI
+        return {
+            "Unique receivers (HyperLogLog)": f"±{1.04 / math.sqrt(1 << self.precision):.2%} standard error",
+            "Listings top-k (Space-Saving)": f"counts overestimated by at most {self.listings.max_error:.1f}",
+            "Claims top-k (Space-Saving)": f"counts overestimated by at most {self.claims.max_error:.1f}",
+            "Completed top-k (Space-Saving)": f"counts overestimated by at most {self.completed.max_error:.1f}",
+        }